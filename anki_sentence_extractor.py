@@ -8,15 +8,22 @@ Outputs file containing extracted sentences, one per line.
 
 import argparse
 import json
+import ijson
 import requests
 from pathlib import Path
 
 ANKI_CONNECT_URL = "http://localhost:8765"
 
+# Number of note IDs requested per notesInfo call
+NOTES_INFO_CHUNK_SIZE = 500
+
+# Reuse one keep-alive connection for all AnkiConnect calls
+_SESSION = requests.Session()
+
 
 def invoke(action, **params):
     payload = {"action": action, "version": 6, "params": params}
-    response = requests.post(ANKI_CONNECT_URL, json=payload)
+    response = _SESSION.post(ANKI_CONNECT_URL, json=payload)
     response_json = response.json()
 
     # Debug: print full top-level JSON response structure
@@ -29,21 +36,55 @@ def invoke(action, **params):
     return response_json["result"]
 
 
+def iter_multi(actions):
+    """Run several AnkiConnect actions in a single request and yield their results in order.
+
+    The response is parsed incrementally, so only one action's result is held in memory at a time.
+    """
+    payload = {"action": "multi", "version": 6, "params": {"actions": [
+        {"action": action, "version": 6, "params": params} for action, params in actions
+    ]}}
+    received = 0
+    top_level_error = []
+
+    def watch_error(events):
+        # Note the top-level error as its events stream past on their way to ijson.items
+        for prefix, event, value in events:
+            if prefix == "error" and event == "string":
+                top_level_error.append(value)
+            yield prefix, event, value
+
+    with _SESSION.post(ANKI_CONNECT_URL, json=payload, stream=True) as response:
+        response.raw.decode_content = True
+        for result in ijson.items(watch_error(ijson.parse(response.raw)), "result.item"):
+            received += 1
+            if result.get("error") is not None:
+                raise Exception(result["error"])
+            yield result["result"]
+
+    # A top-level error comes back with a null result, so nothing was yielded
+    if top_level_error:
+        raise Exception(top_level_error[0])
+    if received != len(actions):
+        raise Exception(f"AnkiConnect multi request returned {received} of {len(actions)} results")
+
+
 def extract_sentences(deck_name, field_name):
     print(f"🔍 Searching for notes in deck '{deck_name}'...")
     note_ids = invoke("findNotes", query=f'deck:"{deck_name}"')
     print(f"✅ Found {len(note_ids)} notes.")
 
     print("📋 Fetching note data...")
-    notes = invoke("notesInfo", notes=note_ids)
-
+    chunks = [note_ids[start:start + NOTES_INFO_CHUNK_SIZE]
+              for start in range(0, len(note_ids), NOTES_INFO_CHUNK_SIZE)]
     sentences = []
-    for note in notes:
-        fields = note.get("fields", {})
-        if field_name in fields:
-            sentence = fields[field_name].get("value", "").strip()
-            if sentence:
-                sentences.append(sentence)
+    for notes in iter_multi([("notesInfo", {"notes": chunk}) for chunk in chunks]):
+        for note in notes:
+            fields = note.get("fields", {})
+            if field_name in fields:
+                sentence = fields[field_name].get("value", "").strip()
+                if sentence:
+                    sentences.append(sentence)
 
     print(f"✅ Extracted {len(sentences)} sentences from field '{field_name}'.")
     return sentences
@@ -51,9 +92,7 @@ def extract_sentences(deck_name, field_name):
 
 def write_sentences(sentences, output_path):
     print(f"💾 Writing to {output_path}...")
-    with open(output_path, "w", encoding="utf-8") as f:
-        for sentence in sentences:
-            f.write(f"{sentence}\n")
+    output_path.write_bytes("".join(f"{sentence}\n" for sentence in sentences).encode("utf-8"))
     print("✅ Done.")
 
 
@@ -14,20 +14,24 @@ See --help for full argument details.
 import os
 import sys
 import argparse
+import functools
 from dotenv import load_dotenv
+import threading
 import time
 import base64
 import logging
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import random
 import json
+from concurrent.futures import ThreadPoolExecutor
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
-import pickle
+from google_auth_httplib2 import AuthorizedHttp
 
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaInMemoryUpload, build_http
 from google.cloud import texttospeech
 
 # Load environment variables
@@ -44,12 +48,29 @@ SCOPES = [
     'https://www.googleapis.com/auth/cloud-platform'  # Added for TTS API
 ]
 
+# Local cache of Drive folder IDs and spreadsheet titles, reused across runs
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', '10k-sentences')
+CACHE_FILE = os.path.join(CACHE_DIR, 'folders.json')
+
+# Journal of uploaded rows whose links have not been written to the sheet yet
+DONE_FILE = os.path.join(CACHE_DIR, 'done.jsonl')
+DONE_FILE_LOCK = threading.Lock()
+
+# Shape of a Drive file's webViewLink
+DRIVE_FILE_VIEW_URL = "https://drive.google.com/file/d/{file_id}/view"
+
+# Uploads at or below this size go in a single multipart request instead of a resumable session
+RESUMABLE_UPLOAD_THRESHOLD = 5 * 1024 * 1024
+
+# Per-thread HTTP connections for worker threads, see init_worker_http
+WORKER_HTTP = threading.local()
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 def is_valid_token_file(file_path):
-    """Check if the token.pickle file is a valid JSON file."""
+    """Check if the token file is a valid JSON file."""
     try:
         with open(file_path, 'r', encoding='utf-8') as token_file:
             json.load(token_file)
@@ -60,11 +81,10 @@ def is_valid_token_file(file_path):
 def get_google_services():
     """Initialize and return Google services."""
     creds = None
-    token_path = 'token.pickle'
+    token_path = 'token.json'
 
     if os.path.exists(token_path) and is_valid_token_file(token_path):
-        with open(token_path, 'r', encoding='utf-8') as token:
-            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
 
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -77,72 +97,180 @@ def get_google_services():
         with open(token_path, 'w', encoding='utf-8') as token:
             token.write(creds.to_json())
 
-    sheets_service = build("sheets", "v4", credentials=creds)
-    drive_service = build("drive", "v3", credentials=creds)
+    # Use the discovery documents bundled with the client library instead of fetching them
+    sheets_service = build("sheets", "v4", credentials=creds, cache_discovery=False, static_discovery=True)
+    drive_service = build("drive", "v3", credentials=creds, cache_discovery=False, static_discovery=True)
     tts_client = texttospeech.TextToSpeechClient(credentials=creds)
-    return sheets_service, drive_service, tts_client
+    return sheets_service, drive_service, tts_client, creds
 
-def read_sheet_column(sheets_service, spreadsheet_id: str, tab_name: str, column_letter: str, start_row: int, force_row_count: Optional[int] = None):
-    """Read values from one column in a sheet starting at start_row.
+def init_worker_http(creds):
+    """Give the current worker thread its own authorized HTTP connection.
+
+    httplib2 is not thread-safe, so worker threads must not share the service objects' connection.
+    build_http() gives it the same socket timeout and 308 handling as the services' own connection.
+    """
+    WORKER_HTTP.http = AuthorizedHttp(creds, http=build_http())
+
+def worker_http():
+    """Return the current worker thread's HTTP connection, or None on the main thread to use the service default.
+
+    Raises RuntimeError on any other thread without its own connection, rather than
+    silently sharing the service objects' connection across threads.
+    """
+    http = getattr(WORKER_HTTP, 'http', None)
+    if http is None and threading.current_thread() is not threading.main_thread():
+        raise RuntimeError("Worker thread has no HTTP connection; start the pool with initializer=init_worker_http")
+    return http
+
+def read_sheet_columns(sheets_service, spreadsheet_id: str, tab_name: str, column_letters: List[str]) -> List[List[str]]:
+    """Read several whole columns (header included) with a single batchGet call.
+
+    Returns one flat list of cell values per column, in the order requested. Trailing empty
+    cells are omitted by the API.
+    """
+    result = sheets_service.spreadsheets().values().batchGet(
+        spreadsheetId=spreadsheet_id,
+        ranges=[f"{tab_name}!{column_letter}1:{column_letter}" for column_letter in column_letters],
+        majorDimension='COLUMNS'
+    ).execute()
+    value_ranges = result.get('valueRanges', [])
+    return [value_range['values'][0] if value_range.get('values') else [] for value_range in value_ranges]
+
+def column_values_from(column: List[str], start_row: int, force_row_count: Optional[int] = None) -> List[str]:
+    """Return the values of a column read by read_sheet_columns, starting at start_row.
 
     If force_row_count is provided, ensure the number of rows returned matches force_row_count,
     filling missing rows with empty strings if necessary.
     For text_col_values, trailing blank values are truncated.
     """
-    range_end = f"{start_row + force_row_count - 1}" if force_row_count else ""
-    range_name = f"{tab_name}!{column_letter}{start_row}:{column_letter}{range_end}"
-    result = sheets_service.spreadsheets().values().get(
-        spreadsheetId=spreadsheet_id, range=range_name).execute()
-    values = result.get('values', [])
+    column_values = list(column[start_row - 1:])
 
-    # Flatten values, fill missing with empty strings
-    column_values = [row[0] if row else '' for row in values]
-
-    if force_row_count:
+    if force_row_count is not None:
         # Ensure the list has exactly force_row_count rows
+        column_values = column_values[:force_row_count]
         while len(column_values) < force_row_count:
             column_values.append('')
-
-    if force_row_count is None:  # Truncate trailing blank values for text_col_values
+    else:  # Truncate trailing blank values for text_col_values
         while column_values and not column_values[-1].strip():
             column_values.pop()
 
     return column_values
 
-def update_sheet_cells_with_retry(sheets_service, spreadsheet_id: str, tab_name: str, start_row: int,
-                                   column_letter: str, values: List[str], max_retries=5):
-    """Write values to a single column starting at start_row with retry logic."""
-    range_name = f"{tab_name}!{column_letter}{start_row}:{column_letter}"
+def batch_update_sheet_cells_with_retry(sheets_service, spreadsheet_id: str, tab_name: str, column_letter: str,
+                                         updates: List[Tuple[int, str]], max_retries=5):
+    """Write (row_num, value) pairs to a single column in one batchUpdate call with retry logic."""
     body = {
-        'values': [[v] for v in values]
+        'valueInputOption': 'USER_ENTERED',
+        'data': [
+            {'range': f"{tab_name}!{column_letter}{row_num}", 'values': [[value]]}
+            for row_num, value in updates
+        ]
     }
 
     def update():
-        return sheets_service.spreadsheets().values().update(
-            spreadsheetId=spreadsheet_id, range=range_name,
-            valueInputOption='USER_ENTERED', body=body).execute()
+        return sheets_service.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id, body=body).execute()
 
     try:
         return exponential_backoff_retry(update, max_retries=max_retries)
     except HttpError as e:
-        logger.error(f"Google Sheets API error while updating cells in range '{range_name}': {e.content}", exc_info=True)
+        logger.error(f"Google Sheets API error while updating {len(updates)} cells in column '{column_letter}': {e.content}", exc_info=True)
     except Exception as e:
-        logger.error(f"Unexpected error while updating cells in range '{range_name}': {e}", exc_info=True)
+        logger.error(f"Unexpected error while updating {len(updates)} cells in column '{column_letter}': {e}", exc_info=True)
+
+def load_cache() -> dict:
+    """Load the on-disk cache, returning an empty cache if it is missing or unreadable."""
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as cache_file:
+            return json.load(cache_file)
+    except (json.JSONDecodeError, UnicodeDecodeError, FileNotFoundError):
+        return {}
 
-def ensure_column_header(sheets_service, spreadsheet_id: str, tab_name: str,
-                         column_letter: str, header_name: str):
-    """Ensure the first row of the column has the header_name."""
-    range_name = f"{tab_name}!{column_letter}1"
-    body = {'values': [[header_name]]}
-    sheets_service.spreadsheets().values().update(
-        spreadsheetId=spreadsheet_id, range=range_name,
-        valueInputOption='USER_ENTERED', body=body).execute()
+def save_cache(cache: dict):
+    """Write the cache back to disk, creating its directory if needed."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(CACHE_FILE, 'w', encoding='utf-8') as cache_file:
+            json.dump(cache, cache_file, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not write cache file '{CACHE_FILE}': {e}")
+
+def load_done_rows(spreadsheet_id: str, tab_name: str) -> Dict[int, dict]:
+    """Return journaled uploads for this sheet tab, keyed by row number."""
+    done_rows = {}
+    try:
+        with open(DONE_FILE, 'r', encoding='utf-8') as done_file:
+            for line in done_file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Ignore a line truncated by an interrupted run
+                if record.get('sheet_id') == spreadsheet_id and record.get('tab') == tab_name:
+                    done_rows[record['row_num']] = record
+    except FileNotFoundError:
+        pass
+    return done_rows
+
+def record_done_row(record: dict):
+    """Append one uploaded row to the journal; safe to call from worker threads."""
+    with DONE_FILE_LOCK:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(DONE_FILE, 'a', encoding='utf-8') as done_file:
+                done_file.write(json.dumps(record) + '\n')
+        except OSError as e:
+            logger.warning(f"Could not write to '{DONE_FILE}': {e}")
+
+def audio_settings(args) -> dict:
+    """Return the run settings that shape the audio; a journaled upload is reused only if they match."""
+    return {'voice_name': args.voice_name, 'speaking_rate': args.speaking_rate, 'audio_encoding': args.audio_encoding}
+
+def clear_done_rows(spreadsheet_id: str, tab_name: str):
+    """Drop this sheet tab's journaled rows once their links are in the sheet."""
+    with DONE_FILE_LOCK:
+        try:
+            with open(DONE_FILE, 'r', encoding='utf-8') as done_file:
+                lines = done_file.readlines()
+            kept = []
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('sheet_id') != spreadsheet_id or record.get('tab') != tab_name:
+                    kept.append(line)
+            with open(DONE_FILE, 'w', encoding='utf-8') as done_file:
+                done_file.writelines(kept)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not update '{DONE_FILE}': {e}")
 
 def create_or_get_audio_folder(drive_service, parent_folder_id: str, sheet_name: str) -> str:
-    """Create or find the audio folder named '{sheet_name}_Audio' under parent_folder_id."""
+    """Create or find the audio folder named '{sheet_name}_Audio' under parent_folder_id.
+
+    The folder ID is cached on disk so later runs skip the Drive search; a cached ID
+    is checked with a cheap get and dropped if the folder was trashed or deleted.
+    """
     folder_name = f"{sheet_name}_Audio"
-    query = f"mimeType='application/vnd.google-apps.folder' and name='{folder_name}' and '{parent_folder_id}' in parents and trashed=false"
-    response = drive_service.files().list(q=query, fields="files(id, name)").execute()
+    cache = load_cache()
+    cache_key = f"{parent_folder_id}/{folder_name}"
+    folder_id = cache.get('folders', {}).get(cache_key)
+    if folder_id:
+        try:
+            folder = drive_service.files().get(fileId=folder_id, fields='trashed').execute()
+            if not folder.get('trashed'):
+                logger.info(f"Audio folder '{folder_name}' found in cache with ID: {folder_id}")
+                return folder_id
+        except HttpError as e:
+            if e.resp.status != 404:
+                raise
+        logger.warning(f"Cached audio folder '{folder_name}' ({folder_id}) no longer exists. Looking it up again.")
+        del cache['folders'][cache_key]
+
+    safe_folder_name = folder_name.replace("\\", "\\\\").replace("'", "\\'")
+    query = f"mimeType='application/vnd.google-apps.folder' and name='{safe_folder_name}' and '{parent_folder_id}' in parents and trashed=false"
+    response = drive_service.files().list(q=query, fields="files(id)", pageSize=1).execute()
     files = response.get('files', [])
     if files:
         folder_id = files[0]['id']
@@ -155,6 +283,9 @@ def create_or_get_audio_folder(drive_service, parent_folder_id: str, sheet_name:
         folder = drive_service.files().create(body=file_metadata, fields='id').execute()
         folder_id = folder.get('id')
 
+    cache.setdefault('folders', {})[cache_key] = folder_id
+    save_cache(cache)
+
     logger.info(f"Audio folder '{folder_name}' created or found with ID: {folder_id}")
     return folder_id
 
@@ -167,32 +298,54 @@ def get_mime_type(audio_encoding):
     }
     return mime_type_map.get(audio_encoding, 'audio/mpeg')
 
+def get_file_extension(audio_encoding):
+    """Return the file extension for the given audio encoding."""
+    extension_map = {
+        'MP3': 'mp3',
+        'OGG_OPUS': 'ogg',
+        'LINEAR16': 'wav'
+    }
+    return extension_map.get(audio_encoding, 'mp3')
+
 def upload_audio_file(drive_service, folder_id: str, filename: str, audio_content: bytes, audio_encoding: str) -> str:
-    """Upload audio bytes as a file to Google Drive folder. Returns shareable link."""
-    from googleapiclient.http import MediaInMemoryUpload
+    """Upload audio bytes as a file to Google Drive folder. Returns shareable link.
 
+    Drive does not accept media uploads inside batch requests, so each file is its
+    own request; throughput comes from the worker pool in main().
+    """
     mime_type = get_mime_type(audio_encoding)
     file_metadata = {
         'name': filename,
         'parents': [folder_id]
     }
-    media = MediaInMemoryUpload(audio_content, mimetype=mime_type, resumable=True)
-    file = drive_service.files().create(body=file_metadata, media_body=media, fields='id, webViewLink').execute()
+    resumable = len(audio_content) > RESUMABLE_UPLOAD_THRESHOLD
+    media = MediaInMemoryUpload(audio_content, mimetype=mime_type, resumable=resumable)
+    file = drive_service.files().create(body=file_metadata, media_body=media, fields='id').execute(http=worker_http())
 
     logger.info(f"Uploaded file '{filename}' to folder ID: {folder_id}")
 
-    # Return the webViewLink for inline playback
-    return file.get('webViewLink')
+    # Return the webViewLink for inline playback, built locally from the file ID
+    return DRIVE_FILE_VIEW_URL.format(file_id=file['id'])
 
-def synthesize_speech(tts_client, text: str, voice_name: str, speaking_rate: float, audio_encoding: str) -> bytes:
-    """Call Google TTS API to synthesize text to audio bytes."""
+@functools.lru_cache(maxsize=16)
+def make_voice_config(voice_name: str, speaking_rate: float, audio_encoding: str):
+    """Build the voice and audio config for a TTS request; they are the same for every sentence in a run."""
     # Extract language code from the voice name (e.g., "en-US" from "en-US-Wavenet-D")
     language_code = "-".join(voice_name.split("-")[:2])
 
-    synthesis_input = texttospeech.SynthesisInput(text=text)
     voice = texttospeech.VoiceSelectionParams(language_code=language_code, name=voice_name)
     audio_config = texttospeech.AudioConfig(audio_encoding=getattr(texttospeech.AudioEncoding, audio_encoding),
                                             speaking_rate=speaking_rate)
+    return voice, audio_config
+
+def synthesize_speech(tts_client, text: str, voice_name: str, speaking_rate: float, audio_encoding: str) -> bytes:
+    """Call Google TTS API to synthesize text to audio bytes.
+
+    The client is shared by all worker threads; its gRPC channel multiplexes their
+    concurrent calls over a single HTTP/2 connection.
+    """
+    synthesis_input = texttospeech.SynthesisInput(text=text)
+    voice, audio_config = make_voice_config(voice_name, speaking_rate, audio_encoding)
 
     response = tts_client.synthesize_speech(
         input=synthesis_input,
@@ -233,59 +386,75 @@ def upload_audio_file_with_retry(drive_service, folder_id, filename, audio_conte
         logger.error(f"Unexpected error while uploading file '{filename}': {e}", exc_info=True)
         return None
 
-def find_rows_needing_audio(audio_column_values, text_column_values, start_row):
-    """Return absolute row numbers for rows needing audio files."""
-    rows_needing_audio = []
-    for idx, (audio_link, text) in enumerate(zip(audio_column_values, text_column_values)):
+def build_work_items(text_column_values, audio_column_values, id_column_values, start_row) -> List[Tuple[int, str, str]]:
+    """Return (row_num, text, sentence_id) for rows needing audio files, in a single pass.
+
+    Rows with empty text or a missing or non-numeric sentence ID are skipped here, so workers
+    need not re-check them.
+    """
+    work_items = []
+    for row_num, (text, audio_link, sentence_id) in enumerate(
+            zip(text_column_values, audio_column_values, id_column_values), start=start_row):
+        if audio_link.strip():
+            continue
         if not text.strip():
-            logger.warning(f"Row {start_row + idx} has empty or missing text. Skipping.")
+            logger.warning(f"Row {row_num} has empty or missing text. Skipping.")
             continue
-        if not audio_link.strip():
-            rows_needing_audio.append(start_row + idx)  # Absolute row number
-    return rows_needing_audio
+        if not sentence_id.strip():
+            logger.error(f"Row {row_num} is missing a sentence ID. Skipping.")
+            continue
+        try:
+            int(sentence_id)
+        except ValueError:
+            logger.error(f"Row {row_num} has a non-numeric sentence ID '{sentence_id}'. Skipping.")
+            continue
+        work_items.append((row_num, text, sentence_id))  # Absolute row number
+    return work_items
 
-def process_row(row_num, text, tts_client, drive_service, sheets_service, audio_folder_id, args):
-    """Process a single row: synthesize audio, upload it, and update the sheet."""
-    if not text.strip():
-        logger.warning(f"Row {row_num} text is empty, skipping.")
-        return
+def hyperlink_formula(link: str, filename: str) -> str:
+    """Return the sheet formula linking to an uploaded audio file."""
+    return f'=HYPERLINK("{link}", "{filename}")'
 
-    logger.info(f"Synthesizing audio for row {row_num}: {text[:40]}...")
+def process_text_group(text, rows, tts_client, drive_service, audio_folder_id, args) -> List[Tuple[int, str]]:
+    """Process all rows sharing the same text: synthesize audio once and upload it for each row.
+
+    rows is a non-empty list of (row_num, sentence_id) already validated by build_work_items.
+    Returns (row_num, hyperlink_formula) pairs for the rows that succeeded.
+    """
+    first_row = rows[0][0]
+    logger.info(f"Synthesizing audio for row {first_row}: {text[:40]}...")
+    if len(rows) > 1:
+        logger.info(f"Reusing audio for {len(rows) - 1} other row(s) with identical text.")
 
     try:
         audio_content = synthesize_speech_with_retry(tts_client, text, args.voice_name, args.speaking_rate, args.audio_encoding)
         if not audio_content:
-            return
+            return []
     except Exception as e:
-        logger.error(f"Error synthesizing speech at row {row_num}: {e}", exc_info=True)
-        return
+        logger.error(f"Error synthesizing speech at row {first_row}: {e}", exc_info=True)
+        return []
 
-    # Get sentence ID for the file name
-    id_range = f"{args.source_tab_name}!{args.id_column}{row_num}:{args.id_column}{row_num}"
-    id_result = sheets_service.spreadsheets().values().get(
-        spreadsheetId=args.sheet_id, range=id_range
-    ).execute()
-    sentence_id = id_result.get("values", [[]])[0][0] if id_result.get("values") else ""
+    results = []
+    for row_num, sentence_id in rows:
+        filename = f"sentence_{int(sentence_id):06}.{get_file_extension(args.audio_encoding)}"
 
-    if not sentence_id.strip():
-        logger.error(f"Row {row_num} is missing a sentence ID. Skipping.")
-        return
+        try:
+            link = upload_audio_file_with_retry(drive_service, audio_folder_id, filename, audio_content, args.audio_encoding)
+            if not link:
+                continue
+            logger.info(f"Uploaded audio for row {row_num}, link: {link}")
+        except Exception as e:
+            logger.error(f"Error uploading audio file at row {row_num}: {e}", exc_info=True)
+            continue
 
-    # Update the filename generation logic in process_row
-    filename = f"sentence_{int(sentence_id):06}.mp3"
+        record_done_row({'sheet_id': args.sheet_id, 'tab': args.source_tab_name, 'row_num': row_num,
+                         'sentence_id': sentence_id, 'text': text, **audio_settings(args),
+                         'link': link, 'filename': filename})
 
-    try:
-        link = upload_audio_file_with_retry(drive_service, audio_folder_id, filename, audio_content, args.audio_encoding)
-        if not link:
-            return
-        logger.info(f"Uploaded audio for row {row_num}, link: {link}")
-    except Exception as e:
-        logger.error(f"Error uploading audio file at row {row_num}: {e}", exc_info=True)
-        return
+        # Hyperlink formula for the sheet, written in one batch once all rows are done
+        results.append((row_num, hyperlink_formula(link, filename)))
 
-    # Update sheet with hyperlink formula
-    hyperlink_formula = f'=HYPERLINK("{link}", "{filename}")'
-    update_sheet_cells_with_retry(sheets_service, args.sheet_id, args.source_tab_name, row_num, args.audio_link_column, [hyperlink_formula])
+    return results
 
 def validate_input_parameters(args):
     """Validate input parameters to ensure they are valid and accessible."""
@@ -293,36 +462,20 @@ def validate_input_parameters(args):
         logger.error("The --speaking_rate parameter must be greater than 0.")
         sys.exit(1)
 
-def validate_sheet_structure(sheets_service, spreadsheet_id, tab_name, text_column, audio_link_column, id_column):
-    """Validate that the sheet has the expected structure with required columns."""
-    # Fetch the header values for the specified columns
-    text_header_range = f"{tab_name}!{text_column}1"
-    audio_link_header_range = f"{tab_name}!{audio_link_column}1"
-    id_header_range = f"{tab_name}!{id_column}1"
-
-    text_header_result = sheets_service.spreadsheets().values().get(
-        spreadsheetId=spreadsheet_id, range=text_header_range
-    ).execute()
-    audio_link_header_result = sheets_service.spreadsheets().values().get(
-        spreadsheetId=spreadsheet_id, range=audio_link_header_range
-    ).execute()
-    id_header_result = sheets_service.spreadsheets().values().get(
-        spreadsheetId=spreadsheet_id, range=id_header_range
-    ).execute()
+    if args.concurrency < 1:
+        logger.error("The --concurrency parameter must be at least 1.")
+        sys.exit(1)
 
-    text_header = text_header_result.get("values", [[]])[0][0] if text_header_result.get("values") else ""
-    audio_link_header = audio_link_header_result.get("values", [[]])[0][0] if audio_link_header_result.get("values") else ""
-    id_header = id_header_result.get("values", [[]])[0][0] if id_header_result.get("values") else ""
+def validate_sheet_structure(tab_name, text_column, id_column, text_header, id_header):
+    """Validate that the sheet has the expected structure with required columns.
 
+    The audio link column header is not checked; it is (re)written as 'audio_file' with the links.
+    """
     # Validate that the headers are not empty
     if not text_header.strip():
         logger.error(f"The text column '{text_column}' is missing a header in the sheet '{tab_name}'.")
         sys.exit(1)
 
-    if not audio_link_header.strip():
-        logger.error(f"The audio link column '{audio_link_column}' is missing a header in the sheet '{tab_name}'.")
-        sys.exit(1)
-
     if not id_header.strip():
         logger.error(f"The ID column '{id_column}' is missing a header in the sheet '{tab_name}'.")
         sys.exit(1)
@@ -332,20 +485,26 @@ def validate_sheet_structure(sheets_service, spreadsheet_id, tab_name, text_colu
         logger.error(f"The text column header in '{tab_name}' must be 'translation', but found '{text_header}'.")
         sys.exit(1)
 
-    if audio_link_header.lower() != "audio_file":
-        logger.error(f"The audio link column header in '{tab_name}' must be 'audio_file', but found '{audio_link_header}'.")
-        sys.exit(1)
-
     if id_header.lower() != "sentence_id":
         logger.error(f"The ID column header in '{tab_name}' must be 'sentence_id', but found '{id_header}'.")
         sys.exit(1)
 
-    logger.info(f"Sheet '{tab_name}' structure validated successfully. Text column header: '{text_header}', Audio link column header: '{audio_link_header}', ID column header: '{id_header}'.")
+    logger.info(f"Sheet '{tab_name}' structure validated successfully. Text column header: '{text_header}', ID column header: '{id_header}'.")
 
 def get_spreadsheet_title(sheets_service, spreadsheet_id):
-    """Retrieve the title of the spreadsheet (file name)."""
-    spreadsheet = sheets_service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-    return spreadsheet.get('properties', {}).get('title', 'Untitled_Sheet')
+    """Retrieve the title of the spreadsheet (file name), using the on-disk cache when possible."""
+    cache = load_cache()
+    title = cache.get('titles', {}).get(spreadsheet_id)
+    if title:
+        return title
+
+    spreadsheet = sheets_service.spreadsheets().get(
+        spreadsheetId=spreadsheet_id, fields='properties.title').execute()
+    title = spreadsheet.get('properties', {}).get('title', 'Untitled_Sheet')
+
+    cache.setdefault('titles', {})[spreadsheet_id] = title
+    save_cache(cache)
+    return title
 
 # Add a test function to verify authentication and SCOPES
 def test_google_services(sheets_service, drive_service, tts_client, sheet_id):
@@ -379,9 +538,10 @@ def main():
     parser.add_argument('--dest_folder_id', required=True, help='Google Drive folder ID where audio subfolder will be created')
     parser.add_argument('--voice_name', required=True, help='Google TTS voice name (e.g., zh-CN-Wavenet-A)')
     parser.add_argument('--speaking_rate', type=float, default=1.0, help='Speaking rate multiplier (default 1.0)')
-    parser.add_argument('--audio_encoding', default='MP3', choices=['MP3', 'OGG_OPUS', 'LINEAR16'], help='Audio encoding format (default MP3)')
+    parser.add_argument('--audio_encoding', default='OGG_OPUS', choices=['MP3', 'OGG_OPUS', 'LINEAR16'], help='Audio encoding format (default OGG_OPUS)')
     parser.add_argument('--max_rows', type=int, default=None, help='Maximum number of rows to process (default: no limit)')
     parser.add_argument('--id_column', default='A', help='Column letter for sentence IDs (default: A)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Number of rows to process in parallel (default: 8)')
 
     args = parser.parse_args()
 
@@ -389,7 +549,7 @@ def main():
     validate_input_parameters(args)
 
     # Initialize Google services
-    sheets_service, drive_service, tts_client = get_google_services()
+    sheets_service, drive_service, tts_client, creds = get_google_services()
 
     # DEBUG: Test Google services
     logger.info("Testing Google services...")
@@ -398,15 +558,22 @@ def main():
     # Get spreadsheet title for folder naming
     spreadsheet_title = get_spreadsheet_title(sheets_service, args.sheet_id)
 
-    # Ensure audio column header exists
-    ensure_column_header(sheets_service, args.sheet_id, args.source_tab_name, args.audio_link_column, 'audio_file')
+    # Read text, audio link and ID columns (headers included) in one request
+    text_cells, audio_cells, id_cells = read_sheet_columns(
+        sheets_service, args.sheet_id, args.source_tab_name,
+        [args.text_column, args.audio_link_column, args.id_column])
+    text_header, audio_header, id_header = (column[0] if column else '' for column in (text_cells, audio_cells, id_cells))
 
-    # Read translated text column (excluding header)
-    text_col_values = read_sheet_column(sheets_service, args.sheet_id, args.source_tab_name,
-                                        args.text_column, args.start_row)
-    # Read existing audio links column (excluding header)
-    audio_col_values = read_sheet_column(sheets_service, args.sheet_id, args.source_tab_name,
-                                         args.audio_link_column, args.start_row, force_row_count=len(text_col_values))
+    # Validate sheet structure
+    validate_sheet_structure(args.source_tab_name, args.text_column, args.id_column, text_header, id_header)
+
+    # The audio column header is written together with the audio links
+    header_updates = [] if audio_header == 'audio_file' else [(1, 'audio_file')]
+
+    # Column values below the header
+    text_col_values = column_values_from(text_cells, args.start_row)
+    audio_col_values = column_values_from(audio_cells, args.start_row, force_row_count=len(text_col_values))
+    id_col_values = column_values_from(id_cells, args.start_row, force_row_count=len(text_col_values))
 
     # Ensure the audio column has the same number of rows as the text column
     if len(audio_col_values) != len(text_col_values):
@@ -414,13 +581,33 @@ def main():
         sys.exit(1)
 
     # Find rows missing audio
-    rows_to_process = find_rows_needing_audio(audio_col_values, text_col_values, args.start_row)
+    work_items = build_work_items(text_col_values, audio_col_values, id_col_values, args.start_row)
 
-    if not rows_to_process:
+    if not work_items:
+        if header_updates:
+            batch_update_sheet_cells_with_retry(sheets_service, args.sheet_id, args.source_tab_name,
+                                                args.audio_link_column, header_updates)
         logger.info("No rows found that require audio generation. Exiting.")
         sys.exit(0)
 
-    logger.info(f"Found {len(rows_to_process)} rows needing audio.")
+    logger.info(f"Found {len(work_items)} rows needing audio.")
+
+    # Rows uploaded by an earlier run whose links never reached the sheet only need the link
+    # written, provided the sentence and the audio settings are unchanged since then
+    done_rows = load_done_rows(args.sheet_id, args.source_tab_name)
+    settings = audio_settings(args)
+    resumed_results = []
+    pending_items = []
+    for row_num, text, sentence_id in work_items:
+        record = done_rows.get(row_num)
+        if (record and record.get('sentence_id') == sentence_id and record.get('text') == text
+                and all(record.get(key) == value for key, value in settings.items())):
+            resumed_results.append((row_num, hyperlink_formula(record['link'], record['filename'])))
+        else:
+            pending_items.append((row_num, text, sentence_id))
+    if resumed_results:
+        logger.info(f"Reusing {len(resumed_results)} audio files uploaded by a previous run.")
+    work_items = pending_items
 
     # Create or get audio folder using spreadsheet title
     audio_folder_id = create_or_get_audio_folder(drive_service, args.dest_folder_id, spreadsheet_title)
@@ -428,18 +615,37 @@ def main():
 
     # Limit rows to process if max_rows is specified
     if args.max_rows is not None:
-        rows_to_process = rows_to_process[:args.max_rows]
+        work_items = work_items[:args.max_rows]
         logger.info(f"Limiting processing to the first {args.max_rows} rows.")
 
-    # Validate sheet structure
-    validate_sheet_structure(sheets_service, args.sheet_id, args.source_tab_name, args.text_column, args.audio_link_column, args.id_column)
-
-    # Process each row
-    for row_num in rows_to_process:
-        # Get text to synthesize
-        idx = row_num - args.start_row
-        text = text_col_values[idx]
-        process_row(row_num, text, tts_client, drive_service, sheets_service, audio_folder_id, args)
+    # Group rows by text so repeated sentences are synthesized only once
+    text_groups: Dict[str, List[Tuple[int, str]]] = {}
+    for row_num, text, sentence_id in work_items:
+        text_groups.setdefault(text, []).append((row_num, sentence_id))
+
+    if len(text_groups) < len(work_items):
+        logger.info(f"{len(work_items)} rows share {len(text_groups)} distinct texts.")
+
+    # Process groups in parallel; each group is independent and network-bound. A failing
+    # group is logged and skipped so the other groups' links still reach the sheet.
+    def process(group):
+        text, rows = group
+        try:
+            return process_text_group(text, rows, tts_client, drive_service, audio_folder_id, args)
+        except Exception as e:
+            logger.error(f"Unexpected error processing rows {[row_num for row_num, _ in rows]}: {e}", exc_info=True)
+            return []
+
+    with ThreadPoolExecutor(max_workers=args.concurrency, initializer=init_worker_http, initargs=(creds,)) as executor:
+        results = resumed_results + [result for group_results in executor.map(process, text_groups.items())
+                                     for result in group_results]
+
+    # Write the header and all hyperlinks back to the sheet in a single request
+    if results or header_updates:
+        logger.info(f"Writing {len(results)} audio links to the sheet...")
+        if batch_update_sheet_cells_with_retry(sheets_service, args.sheet_id, args.source_tab_name,
+                                               args.audio_link_column, header_updates + results):
+            clear_done_rows(args.sheet_id, args.source_tab_name)
 
     logger.info("Audio generation complete.")
 
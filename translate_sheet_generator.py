@@ -2,34 +2,35 @@
 translate_sheet_generator.py
 
 This script automates the creation of a translated Google Sheet from an English sentence source sheet.
-It uses the built-in =GOOGLETRANSLATE() formula, waits for all formulas to resolve, and then copies
-translated values into a permanent column. Optional font and formatting options can be applied.
+By default it translates the sentences with the Cloud Translation API and writes the results directly.
+Alternatively (--translator formula) it uses the built-in =GOOGLETRANSLATE() formula, waits for all
+formulas to resolve, and then replaces them with the translated values. Optional font and
+formatting options can be applied.
 
 Intended for use in the DIY 10,000 Sentences project.
 """
 
 import os
+import sys
 import time
+import functools
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
 from google.oauth2 import service_account
+from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-import pickle
+from google_auth_httplib2 import AuthorizedHttp
+from google.api_core import retry
+from google.cloud import translate_v3
 import json
 
-# Load environment variables
-load_dotenv()
-
-SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE")
-if not SERVICE_ACCOUNT_FILE or not os.path.exists(SERVICE_ACCOUNT_FILE):
-    print("Error: GOOGLE_SERVICE_ACCOUNT_FILE is not set or the file does not exist.")
-    sys.exit(1)
-
 def is_valid_token_file(file_path):
-    """Check if the token.pickle file is a valid JSON file."""
+    """Check if the token file is a valid JSON file."""
     try:
         with open(file_path, 'r', encoding='utf-8') as token_file:
             json.load(token_file)
@@ -44,14 +45,37 @@ SCOPES = [
     "https://www.googleapis.com/auth/cloud-platform"
 ]
 
-def get_google_services():
-    """Initialize and return Google services."""
+# Retries (with exponential backoff) for API requests failing with 429 or 5xx errors
+NUM_RETRIES = 5
+
+# Number of sentences sent per Cloud Translation request
+TRANSLATE_BATCH_SIZE = 100
+
+# Header row of the destination sheet
+HEADER_VALUES = [["sentence_id", "sentence", "translation"]]
+
+# Spare cell used to track unresolved formulas, and the polling delay bounds in seconds
+STATUS_CELL = "E1"
+LOADING_VALUE = "Loading..."
+MIN_POLL_DELAY = 2
+MAX_POLL_DELAY = 30
+
+# Rows sent per write request, and how many of those requests run at once
+WRITE_CHUNK_ROWS = 5000
+MAX_WRITE_WORKERS = 4
+
+# Rows in the grid of a newly created sheet
+NEW_SHEET_ROW_COUNT = 1000
+
+# Google clients are created on first use, so importing this module does no I/O
+@functools.lru_cache(maxsize=None)
+def get_credentials():
+    """Load, refresh or obtain OAuth credentials."""
     creds = None
-    token_path = 'token.pickle'
+    token_path = 'token.json'
 
     if os.path.exists(token_path) and is_valid_token_file(token_path):
-        with open(token_path, 'r', encoding='utf-8') as token:
-            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
 
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -64,82 +88,102 @@ def get_google_services():
         with open(token_path, 'w', encoding='utf-8') as token:
             token.write(creds.to_json())
 
-    sheets_service = build("sheets", "v4", credentials=creds)
-    drive_service = build("drive", "v3", credentials=creds)
-    return sheets_service, drive_service
-
-# Replace the initialization of Google APIs with the new function
-sheets_service, drive_service = get_google_services()
+    return creds
 
-def wait_for_translations(spreadsheet_id, sheet_name, formula_col_letter, start_row, num_rows):
-    print("Waiting for Google Translate formulas to resolve...")
-    while True:
-        range_ = f"{sheet_name}!{formula_col_letter}{start_row}:{formula_col_letter}{start_row + num_rows - 1}"
-        result = sheets_service.spreadsheets().values().get(
-            spreadsheetId=spreadsheet_id,
-            range=range_
-        ).execute()
-        values = result.get("values", [])
+# Use the discovery documents bundled with the client library instead of fetching them
+@functools.lru_cache(maxsize=None)
+def get_sheets_service():
+    return build("sheets", "v4", credentials=get_credentials(), cache_discovery=False, static_discovery=True)
 
-        if len(values) == num_rows and all(row and not row[0].startswith("=") for row in values):
-            print("All translations completed.")
-            return values
+@functools.lru_cache(maxsize=None)
+def get_drive_service():
+    return build("drive", "v3", credentials=get_credentials(), cache_discovery=False, static_discovery=True)
 
-        print("...still waiting, sleeping 15 seconds")
-        time.sleep(15)
+@functools.lru_cache(maxsize=None)
+def get_translate_client():
+    return translate_v3.TranslationServiceClient(credentials=get_credentials())
 
+def wait_for_translations(spreadsheet_id, sheet_name, formula_col_letter, start_row, num_rows,
+                          chunk_rows=WRITE_CHUNK_ROWS):
+    """
+    Wait for the formulas in the given column to resolve and return their values.
+    Uses STATUS_CELL as a helper; the caller clears it together with its next write.
+    The resolved values are read in blocks of at most chunk_rows rows.
+    """
+    print("Waiting for Google Translate formulas to resolve...")
+    end_row = start_row + num_rows - 1
+
+    # Helper cell counting formulas that are still loading, so each poll reads a single cell
+    status_range = f"{sheet_name}!{STATUS_CELL}"
+    get_sheets_service().spreadsheets().values().update(
+        spreadsheetId=spreadsheet_id,
+        range=status_range,
+        body={"values": [[f'=COUNTIF({formula_col_letter}{start_row}:{formula_col_letter}{end_row}, "{LOADING_VALUE}")']]},
+        valueInputOption="USER_ENTERED"
+    ).execute(num_retries=NUM_RETRIES)
 
-def set_column_font_and_size(spreadsheet_id, sheet_id, column_index, font_family=None, font_size=None):
-    requests = []
-    if font_family:
-        requests.append({
-            "repeatCell": {
-                "range": {
-                    "sheetId": sheet_id,
-                    "startColumnIndex": column_index,
-                    "endColumnIndex": column_index + 1
-                },
-                "cell": {
-                    "userEnteredFormat": {
-                        "textFormat": {
-                            "fontFamily": font_family
-                        }
-                    }
-                },
-                "fields": "userEnteredFormat.textFormat.fontFamily"
-            }
-        })
+    delay = MIN_POLL_DELAY
+    while True:
+        result = get_sheets_service().spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=status_range,
+            valueRenderOption="FORMATTED_VALUE"
+        ).execute(num_retries=NUM_RETRIES)
+        pending = result.get("values", [[""]])[0][0]
+
+        if pending == "0":
+            # Rendered values: a pending GOOGLETRANSLATE reads "Loading...", a failed one "#..."
+            read_chunk = functools.partial(read_column_chunk, spreadsheet_id, sheet_name, formula_col_letter, start_row)
+            values = [row for block in run_in_chunks(read_chunk, range(num_rows), chunk_rows, "Read")
+                      for row in block]
+
+            if len(values) == num_rows and all(row and row[0] != LOADING_VALUE for row in values):
+                failed_rows = [start_row + i for i, row in enumerate(values) if row[0].startswith("#")]
+                if failed_rows:
+                    print(f"Warning: {len(failed_rows)} translations failed, e.g. rows {failed_rows[:10]}")
+                print("All translations completed.")
+                return values
+
+        print(f"...still waiting ({pending} pending), sleeping {delay:.0f} seconds")
+        time.sleep(delay)
+        delay = min(delay * 1.5, MAX_POLL_DELAY)
+
+
+def set_columns_format(sheet_id, start_column_index, end_column_index, font_size=None, font_family=None):
+    """
+    Return batchUpdate requests setting the font size and/or family of columns
+    start_column_index (inclusive) to end_column_index (exclusive). Zero-based indices.
+    """
+    text_format = {}
     if font_size:
-        requests.append({
-            "repeatCell": {
-                "range": {
-                    "sheetId": sheet_id,
-                    "startColumnIndex": column_index,
-                    "endColumnIndex": column_index + 1
-                },
-                "cell": {
-                    "userEnteredFormat": {
-                        "textFormat": {
-                            "fontSize": font_size
-                        }
-                    }
-                },
-                "fields": "userEnteredFormat.textFormat.fontSize"
-            }
-        })
-
-    if requests:
-        body = {"requests": requests}
-        sheets_service.spreadsheets().batchUpdate(
-            spreadsheetId=spreadsheet_id, body=body).execute()
+        text_format["fontSize"] = font_size
+    if font_family:
+        text_format["fontFamily"] = font_family
+    if not text_format:
+        return []
+    return [{
+        "repeatCell": {
+            "range": {
+                "sheetId": sheet_id,
+                "startColumnIndex": start_column_index,
+                "endColumnIndex": end_column_index
+            },
+            "cell": {
+                "userEnteredFormat": {
+                    "textFormat": text_format
+                }
+            },
+            "fields": "userEnteredFormat.textFormat(" + ",".join(text_format) + ")"
+        }
+    }]
 
 
-def auto_resize_columns(spreadsheet_id, sheet_id, start_column_index, end_column_index):
+def auto_resize_columns(sheet_id, start_column_index, end_column_index):
     """
-    Auto resize columns in the given sheet from start_column_index (inclusive)
-    to end_column_index (exclusive). Zero-based indices.
+    Return batchUpdate requests auto resizing columns in the given sheet from
+    start_column_index (inclusive) to end_column_index (exclusive). Zero-based indices.
     """
-    requests = [{
+    return [{
         "autoResizeDimensions": {
             "dimensions": {
                 "sheetId": sheet_id,
@@ -149,33 +193,55 @@ def auto_resize_columns(spreadsheet_id, sheet_id, start_column_index, end_column
             }
         }
     }]
-    body = {"requests": requests}
-    sheets_service.spreadsheets().batchUpdate(
-        spreadsheetId=spreadsheet_id, body=body).execute()
 
 
-def delete_column(spreadsheet_id, sheet_id, column_index):
+def update_cells(sheet_id, rows, start_row_index=0):
     """
-    Delete a single column from the sheet.
-    column_index is zero-based.
+    Return batchUpdate requests writing rows of raw values into the sheet, starting at
+    column A of the given zero-based row. Numbers are written as numbers and everything
+    else as plain strings.
     """
-    requests = [{
-        "deleteDimension": {
-            "range": {
+    return [{
+        "updateCells": {
+            "start": {
                 "sheetId": sheet_id,
-                "dimension": "COLUMNS",
-                "startIndex": column_index,
-                "endIndex": column_index + 1
-            }
+                "rowIndex": start_row_index,
+                "columnIndex": 0
+            },
+            "rows": [
+                {"values": [
+                    {"userEnteredValue": {"numberValue": value} if isinstance(value, (int, float))
+                     else {"stringValue": value}}
+                    for value in row
+                ]}
+                for row in rows
+            ],
+            "fields": "userEnteredValue"
+        }
+    }]
+
+
+def grow_row_count(sheet_id, row_count):
+    """
+    Return batchUpdate requests growing a new sheet's grid to hold row_count rows.
+    updateCells does not grow the grid, and a new sheet only has NEW_SHEET_ROW_COUNT
+    rows; the grid is never shrunk below that.
+    """
+    return [{
+        "updateSheetProperties": {
+            "properties": {
+                "sheetId": sheet_id,
+                "gridProperties": {
+                    "rowCount": max(row_count, NEW_SHEET_ROW_COUNT)
+                }
+            },
+            "fields": "gridProperties.rowCount"
         }
     }]
-    body = {"requests": requests}
-    sheets_service.spreadsheets().batchUpdate(
-        spreadsheetId=spreadsheet_id, body=body).execute()
 
 
-def freeze_top_row(spreadsheet_id, sheet_id):
-    requests = [{
+def freeze_top_row(sheet_id):
+    return [{
         "updateSheetProperties": {
             "properties": {
                 "sheetId": sheet_id,
@@ -186,12 +252,9 @@ def freeze_top_row(spreadsheet_id, sheet_id):
             "fields": "gridProperties.frozenRowCount"
         }
     }]
-    body = {"requests": requests}
-    sheets_service.spreadsheets().batchUpdate(
-        spreadsheetId=spreadsheet_id, body=body).execute()
 
-def set_row_font(spreadsheet_id, sheet_id, row_index, font_family):
-    requests = [{
+def set_row_font(sheet_id, row_index, font_family):
+    return [{
         "repeatCell": {
             "range": {
                 "sheetId": sheet_id,
@@ -208,18 +271,18 @@ def set_row_font(spreadsheet_id, sheet_id, row_index, font_family):
             "fields": "userEnteredFormat.textFormat.fontFamily"
         }
     }]
-    body = {"requests": requests}
-    sheets_service.spreadsheets().batchUpdate(
-        spreadsheetId=spreadsheet_id, body=body).execute()
 
 
 def fetch_english_sentences(source_sheet_id, source_tab_name):
     print(f"Fetching English sentences from {source_sheet_id} - {source_tab_name}...")
     source_range = f"{source_tab_name}!A1:A"
-    result = sheets_service.spreadsheets().values().get(
-        spreadsheetId=source_sheet_id, range=source_range
-    ).execute()
-    english_sentences = result.get("values", [])
+    # Read as a single column so the API returns one flat list instead of a list per row
+    result = get_sheets_service().spreadsheets().values().get(
+        spreadsheetId=source_sheet_id, range=source_range,
+        majorDimension="COLUMNS", valueRenderOption="UNFORMATTED_VALUE"
+    ).execute(num_retries=NUM_RETRIES)
+    # Unformatted numeric cells come back as numbers; blank cells are skipped so ids stay contiguous
+    english_sentences = [text for text in map(str, result.get("values", [[]])[0]) if text.strip()]
     num_rows = len(english_sentences)
 
     if num_rows == 0:
@@ -230,98 +293,189 @@ def fetch_english_sentences(source_sheet_id, source_tab_name):
     return english_sentences, num_rows
 
 
-def create_destination_sheet(dest_sheet_name, dest_folder_id):
+def create_destination_sheet(dest_sheet_name, dest_folder_id, http=None):
+    """
+    Create the destination spreadsheet. Returns (spreadsheet_id, sheet_id) of its first sheet.
+    Pass http when calling from another thread, as the services' own connection is not thread-safe.
+    """
     try:
-        file_metadata = {
-            "name": dest_sheet_name,
-            "mimeType": "application/vnd.google-apps.spreadsheet"
-        }
+        # Not retried: create is not idempotent, so a retry after a lost response would
+        # leave an orphaned spreadsheet behind
+        spreadsheet = get_sheets_service().spreadsheets().create(
+            body={"properties": {"title": dest_sheet_name}},
+            fields="spreadsheetId,sheets.properties.sheetId"
+        ).execute(http=http)
+        spreadsheet_id = spreadsheet["spreadsheetId"]
+        sheet_id = spreadsheet["sheets"][0]["properties"]["sheetId"]
+
+        # New spreadsheets land in My Drive; move it if a folder was given
         if dest_folder_id:
-            file_metadata["parents"] = [dest_folder_id]
-
-        new_sheet = drive_service.files().create(body=file_metadata, fields="id").execute()
-        return new_sheet["id"]
+            get_drive_service().files().update(
+                fileId=spreadsheet_id,
+                addParents=dest_folder_id,
+                removeParents="root",
+                fields="id,parents"
+            ).execute(http=http, num_retries=NUM_RETRIES)
+
+        return spreadsheet_id, sheet_id
     except HttpError as e:
         print(f"Failed to create destination sheet: {e}")
-        return None
+        return None, None
+
+
+def delete_destination_sheet(spreadsheet_id):
+    """Delete a destination spreadsheet that will not be filled in."""
+    if spreadsheet_id:
+        get_drive_service().files().delete(fileId=spreadsheet_id).execute(num_retries=NUM_RETRIES)
 
 
-def populate_destination_sheet(dest_sheet_id, english_sentences, target_lang, num_rows):
-    rows = []
-    for i, row in enumerate(english_sentences, start=1):
-        sid = i
-        english = row[0]
-        formula = f'=GOOGLETRANSLATE(B{i+1}, "en", "{target_lang}")'
-        rows.append([sid, english, formula])
+def translate_sentences(english_sentences, target_lang, project_id):
+    print(f"Translating {len(english_sentences)} sentences with Cloud Translation...")
+    parent = f"projects/{project_id}/locations/global"
 
-    value_range = {
-        "range": "Sheet1!A2:C",
-        "majorDimension": "ROWS",
-        "values": rows
-    }
+    translations = []
+    for start in range(0, len(english_sentences), TRANSLATE_BATCH_SIZE):
+        response = get_translate_client().translate_text(request={
+            "parent": parent,
+            "contents": english_sentences[start:start + TRANSLATE_BATCH_SIZE],
+            "mime_type": "text/plain",
+            "source_language_code": "en",
+            "target_language_code": target_lang,
+        }, retry=retry.Retry())
+        translations.extend(translation.translated_text for translation in response.translations)
 
-    sheets_service.spreadsheets().values().update(
+    print("All translations completed.")
+    return translations
+
+
+def chunks(seq, size):
+    """Yield (offset, block) pairs splitting seq into blocks of at most size items."""
+    for offset in range(0, len(seq), size):
+        yield offset, seq[offset:offset + size]
+
+
+def run_in_chunks(run_chunk, rows, chunk_rows, action="Wrote"):
+    """
+    Call run_chunk(offset, block, http) for each block of at most chunk_rows rows and
+    return the results in order. Several blocks run at once, each on its own connection
+    as httplib2 is not thread-safe. A single block runs directly on the services' connection.
+    """
+    blocks = list(chunks(rows, chunk_rows))
+    if len(blocks) == 1:
+        return [run_chunk(0, rows, None)]
+
+    credentials = get_credentials()
+    results = []
+    with ThreadPoolExecutor(max_workers=MAX_WRITE_WORKERS) as executor:
+        futures = [executor.submit(run_chunk, offset, block, AuthorizedHttp(credentials, http=build_http()))
+                   for offset, block in blocks]
+        for done, future in enumerate(futures, start=1):
+            results.append(future.result())
+            print(f"{action} {done}/{len(blocks)} blocks of rows")
+    return results
+
+
+def read_column_chunk(spreadsheet_id, sheet_name, col_letter, first_row, offset, block, http=None):
+    """
+    Read the rendered values of one column for a block of rows starting at row first_row + offset.
+    Missing trailing cells come back as empty rows so blocks stay aligned.
+    """
+    start = first_row + offset
+    result = get_sheets_service().spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id,
+        range=f"{sheet_name}!{col_letter}{start}:{col_letter}{start + len(block) - 1}",
+        valueRenderOption="FORMATTED_VALUE"
+    ).execute(http=http, num_retries=NUM_RETRIES)
+    values = result.get("values", [])
+    return values + [[] for _ in range(len(block) - len(values))]
+
+
+def write_values_chunk(dest_sheet_id, first_row, offset, block, http=None):
+    """Write a block of rows (formulas allowed) starting at column A of row first_row + offset."""
+    start = first_row + offset
+    cell_range = f"Sheet1!A{start}:C{start + len(block) - 1}"
+    get_sheets_service().spreadsheets().values().update(
         spreadsheetId=dest_sheet_id,
-        range="Sheet1!A2:C",
-        body=value_range,
+        range=cell_range,
+        body={"range": cell_range, "majorDimension": "ROWS", "values": block},
         valueInputOption="USER_ENTERED"
-    ).execute()
+    ).execute(http=http, num_retries=NUM_RETRIES)
 
-    # Copy raw translations from column C to D
-    translations = [[cell[0]] for cell in wait_for_translations(dest_sheet_id, "Sheet1", "C", 2, num_rows)]
-    sheets_service.spreadsheets().values().update(
-        spreadsheetId=dest_sheet_id,
-        range="Sheet1!D2:D",
-        body={"values": translations},
-        valueInputOption="RAW"
-    ).execute()
 
-    # Clear column C (raw translations) to avoid continuous use of formulas
-    sheets_service.spreadsheets().values().update(
-        spreadsheetId=dest_sheet_id,
-        range="Sheet1!C2:C",
-        body={"values": [[""] for _ in range(num_rows)]},
-        valueInputOption="RAW"
-    ).execute()
+def write_translations_chunk(dest_sheet_id, offset, block, http=None):
+    """
+    Replace the formulas in a block of column C with their raw translations, starting at
+    row 2 + offset. The first block also clears the status cell in the same request.
+    """
+    start = 2 + offset
+    data = [{"range": f"Sheet1!C{start}:C{start + len(block) - 1}", "values": block}]
+    if offset == 0:
+        data.append({"range": f"Sheet1!{STATUS_CELL}", "values": [[""]]})
+    get_sheets_service().spreadsheets().values().batchUpdate(
+        spreadsheetId=dest_sheet_id, body={"valueInputOption": "RAW", "data": data}
+    ).execute(http=http, num_retries=NUM_RETRIES)
 
 
-def apply_sheet_formatting(dest_sheet_id, sheet_id, num_rows, font_size, target_font):
-    # Apply font size to all columns A-D if given
-    if font_size:
-        for col_index in range(4):
-            set_column_font_and_size(dest_sheet_id, sheet_id, col_index, font_size=font_size)
+def write_cells_chunk(dest_sheet_id, sheet_id, offset, block, http=None):
+    """Write a block of raw values starting at column A of the zero-based row offset."""
+    get_sheets_service().spreadsheets().batchUpdate(
+        spreadsheetId=dest_sheet_id, body={"requests": update_cells(sheet_id, block, offset)}
+    ).execute(http=http, num_retries=NUM_RETRIES)
 
-    # Apply font to translated column (D, index 3) if given
-    if target_font:
-        set_column_font_and_size(dest_sheet_id, sheet_id, 3, font_family=target_font)
 
-    # Auto resize columns B and D
-    try:
-        auto_resize_columns(dest_sheet_id, sheet_id, 1, 2)  # B
-        auto_resize_columns(dest_sheet_id, sheet_id, 3, 4)  # D
-    except HttpError as e:
-        print(f"Failed to auto-resize columns: {e}")
+def populate_destination_sheet(dest_sheet_id, english_sentences, target_lang, num_rows, chunk_rows=WRITE_CHUNK_ROWS):
+    # Only the row reference varies between formulas; escape the language code for the formula once
+    formula_fmt = '=GOOGLETRANSLATE(B{0}, "en", "%s")' % target_lang.replace('"', '""')
+    # The header goes out with the first block of rows
+    rows = HEADER_VALUES + [[i, english, formula_fmt.format(i + 1)] for i, english in enumerate(english_sentences, start=1)]
 
-    delete_column(dest_sheet_id, sheet_id, 2)  # column C is index 2
+    run_in_chunks(functools.partial(write_values_chunk, dest_sheet_id, 1), rows, chunk_rows)
 
-    header_values = [["sentence_id", "sentence", "translation"]]
+    translations = [[cell[0]] for cell in wait_for_translations(dest_sheet_id, "Sheet1", "C", 2, num_rows, chunk_rows)]
 
-    sheets_service.spreadsheets().values().update(
-        spreadsheetId=dest_sheet_id,
-        range="Sheet1!A1:C1",
-        body={"values": header_values},
-        valueInputOption="RAW"
-    ).execute()
+    # Replace the formulas in column C with their raw translations to avoid continuous
+    # use of formulas, clearing the status cell along with the first block
+    run_in_chunks(functools.partial(write_translations_chunk, dest_sheet_id), translations, chunk_rows)
+
+
+def apply_sheet_formatting(dest_sheet_id, sheet_id, num_rows, font_size, target_font, rows=None,
+                           chunk_rows=WRITE_CHUNK_ROWS):
+    # All formatting goes in a single batchUpdate. If rows are given, they are written
+    # in the same batchUpdate, ahead of the formatting so auto resize sees them. Rows
+    # that do not fit in one chunk are written in blocks first.
+    requests = []
+    if rows and len(rows) > chunk_rows:
+        # Grow the grid once, up front, so the concurrent blocks all land inside it
+        get_sheets_service().spreadsheets().batchUpdate(
+            spreadsheetId=dest_sheet_id, body={"requests": grow_row_count(sheet_id, len(rows))}
+        ).execute(num_retries=NUM_RETRIES)
+        run_in_chunks(functools.partial(write_cells_chunk, dest_sheet_id, sheet_id), rows, chunk_rows)
+    elif rows:
+        requests += grow_row_count(sheet_id, len(rows))
+        requests += update_cells(sheet_id, rows)
+
+    # Apply font size to all columns A-C if given
+    requests += set_columns_format(sheet_id, 0, 3, font_size=font_size)
+
+    # Apply font to translated column (C, index 2) if given
+    requests += set_columns_format(sheet_id, 2, 3, font_family=target_font)
+
+    # Auto resize columns B and C
+    requests += auto_resize_columns(sheet_id, 1, 2)  # B
+    requests += auto_resize_columns(sheet_id, 2, 3)  # C
 
     # Freeze top row
-    freeze_top_row(dest_sheet_id, sheet_id)
+    requests += freeze_top_row(sheet_id)
 
     # Set monospace font on the top row (row index 0)
-    set_row_font(dest_sheet_id, sheet_id, 0, "Courier New")
+    requests += set_row_font(sheet_id, 0, "Courier New")
+
+    get_sheets_service().spreadsheets().batchUpdate(
+        spreadsheetId=dest_sheet_id, body={"requests": requests}).execute(num_retries=NUM_RETRIES)
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Generate a translated Google Sheet using formulas.")
+    parser = argparse.ArgumentParser(description="Generate a translated Google Sheet.")
     parser.add_argument("--source_sheet_id", required=True)
     parser.add_argument("--source_tab_name", default="Sheet1")
     parser.add_argument("--dest_sheet_name", required=True)
@@ -329,27 +483,69 @@ def main():
     parser.add_argument("--target_font", required=False, help="Optional font for translated column")
     parser.add_argument("--font_size", required=False, type=int, help="Optional font size to apply to all columns")
     parser.add_argument("--dest_folder_id", required=False)
+    parser.add_argument("--translator", choices=["cloud", "formula"], default="cloud",
+                        help="Translate with the Cloud Translation API (default) or with =GOOGLETRANSLATE() formulas")
+    parser.add_argument("--project_id", default=os.getenv("GOOGLE_CLOUD_PROJECT"),
+                        help="Google Cloud project for the Cloud Translation API (default: $GOOGLE_CLOUD_PROJECT)")
+    parser.add_argument("--chunk_rows", type=int, default=WRITE_CHUNK_ROWS,
+                        help=f"Rows per write request; larger sheets are written in concurrent blocks (default: {WRITE_CHUNK_ROWS})")
     args = parser.parse_args()
 
-    english_sentences, num_rows = fetch_english_sentences(args.source_sheet_id, args.source_tab_name)
-    if num_rows == 0:
-        return
+    if args.chunk_rows < 1:
+        parser.error("--chunk_rows must be at least 1")
+    if args.translator == "cloud" and not args.project_id:
+        parser.error("--project_id (or GOOGLE_CLOUD_PROJECT) is required with --translator cloud")
+
+    service_account_file = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE")
+    if not service_account_file or not os.path.exists(service_account_file):
+        print("Error: GOOGLE_SERVICE_ACCOUNT_FILE is not set or the file does not exist.")
+        sys.exit(1)
+
+    # Creating the destination does not depend on the source data, so it runs in the
+    # background (on its own connection) while the sentences are read and translated.
+    # Build both services first so the two threads do not each build them.
+    translations = None
+    get_sheets_service()
+    get_drive_service()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        dest_future = executor.submit(create_destination_sheet, args.dest_sheet_name, args.dest_folder_id,
+                                      AuthorizedHttp(get_credentials(), http=build_http()))
+        try:
+            english_sentences, num_rows = fetch_english_sentences(args.source_sheet_id, args.source_tab_name)
+            if num_rows and args.translator == "cloud":
+                translations = translate_sentences(english_sentences, args.target_lang, args.project_id)
+        except Exception:
+            # Best-effort cleanup; the original error is the one reported
+            try:
+                delete_destination_sheet(dest_future.result()[0])
+            except Exception as cleanup_error:
+                print(f"Error deleting the unused destination sheet: {cleanup_error}")
+            raise
+        dest_sheet_id, sheet_id = dest_future.result()
 
-    dest_sheet_id = create_destination_sheet(args.dest_sheet_name, args.dest_folder_id)
     if not dest_sheet_id:
         return
 
-    populate_destination_sheet(dest_sheet_id, english_sentences, args.target_lang, num_rows)
+    if num_rows == 0:
+        delete_destination_sheet(dest_sheet_id)
+        return
 
-    print(f"Applying formatting to destination sheet...")
+    rows = None
+    if translations is not None:
+        # Written together with the formatting in a single batchUpdate
+        rows = HEADER_VALUES + [[i, english, translation]
+                                for i, (english, translation) in enumerate(zip(english_sentences, translations), start=1)]
+    else:
+        populate_destination_sheet(dest_sheet_id, english_sentences, args.target_lang, num_rows, args.chunk_rows)
 
-    # Get sheet ID for formatting
-    spreadsheet = sheets_service.spreadsheets().get(spreadsheetId=dest_sheet_id).execute()
-    sheet_id = spreadsheet["sheets"][0]["properties"]["sheetId"]
+    print(f"Applying formatting to destination sheet...")
 
-    apply_sheet_formatting(dest_sheet_id, sheet_id, num_rows, args.font_size, args.target_font)
+    apply_sheet_formatting(dest_sheet_id, sheet_id, num_rows, args.font_size, args.target_font, rows=rows,
+                           chunk_rows=args.chunk_rows)
 
     print(f"✅ Translation sheet created: https://docs.google.com/spreadsheets/d/{dest_sheet_id}")
 
 if __name__ == "__main__":
+    # Load environment variables
+    load_dotenv()
     main()